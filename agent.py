@@ -7,8 +7,10 @@ from langchain_core.prompts.chat import ChatPromptTemplate
 from langgraph.graph import START, StateGraph, END
 from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 from src.prompt_library.prompt import system_prompt
-from src.utils.llms import LLMModel
+from src.utils.llms import LLMModel, RETRYABLE_ERRORS
+from src.utils.deadline import DeadlineExceeded, get_deadline, with_deadline_timeout
 from src.toolkit.toolkits import *
 
 class Router(TypedDict):
@@ -22,13 +24,24 @@ class AgentState(TypedDict):
     query: str
     current_reasoning: str
     iteration_count: int
+    status: str
 
 class DoctorAppointmentAgent:
     def __init__(self):
-        llm_model = LLMModel()
+        # Client retries would repeat a timed-out call with a full timeout; calls are retried within the deadline instead
+        llm_model = LLMModel(max_retries=0)
         self.llm_model=llm_model.get_model()
+
+    def _agent_model(self, tools, config: RunnableConfig):
+        # Pre-bind the tools so create_react_agent keeps the per-call timeout binding
+        return with_deadline_timeout(self.llm_model.bind_tools(tools), get_deadline(config), RETRYABLE_ERRORS)
+
+    def _deadline_finish(self, error: DeadlineExceeded, update: dict = None) -> Command:
+        status = "cancelled" if error.cancelled else "deadline_exceeded"
+        print(f"!!!! {error} - RETURNING PARTIAL ANSWER ({status}) !!!!")
+        return Command(goto=END, update={**(update or {}), 'next': 'FINISH', 'status': status})
     
-    def supervisor_node(self, state: AgentState) -> Command[Literal['information_node', 'booking_node', '__end__']]:
+    def supervisor_node(self, state: AgentState, config: RunnableConfig) -> Command[Literal['information_node', 'booking_node', '__end__']]:
         print("**************************below is my state right after entering****************************")
         print(state)
         
@@ -39,7 +52,15 @@ class DoctorAppointmentAgent:
         # Force finish after 5 iterations to prevent infinite loops
         if current_iteration >= 5:
             print("!!!! MAX ITERATIONS REACHED - FORCING FINISH !!!!")
-            return Command(goto=END, update={'next': 'FINISH', 'iteration_count': current_iteration})
+            return Command(goto=END, update={'next': 'FINISH', 'iteration_count': current_iteration, 'status': 'max_iterations'})
+
+        # Stop before spending more tokens once the request is out of time
+        deadline = get_deadline(config)
+        if deadline is not None:
+            try:
+                deadline.check("supervisor iteration")
+            except DeadlineExceeded as e:
+                return self._deadline_finish(e, {'iteration_count': current_iteration})
         
         messages = [
             {"role": "system", "content": system_prompt},
@@ -57,7 +78,11 @@ class DoctorAppointmentAgent:
         print("************below is my query********************")    
         print(query)
         
-        response = self.llm_model.with_structured_output(Router).invoke(messages)
+        try:
+            router = with_deadline_timeout(self.llm_model.with_structured_output(Router), get_deadline(config), RETRYABLE_ERRORS)
+            response = router.invoke(messages)
+        except DeadlineExceeded as e:
+            return self._deadline_finish(e, {'iteration_count': current_iteration})
         
         goto = response["next"]
         
@@ -70,6 +95,8 @@ class DoctorAppointmentAgent:
         if goto == "FINISH":
             goto = END
             
+        status = 'completed' if goto == END else ''
+            
         print("**************************below is my state****************************")
         print(state)
         
@@ -78,14 +105,16 @@ class DoctorAppointmentAgent:
                                             'query': query, 
                                             'current_reasoning': response["reasoning"],
                                             'iteration_count': current_iteration,
+                                            'status': status,
                                             'messages': [HumanMessage(content=f"user's identification number is {state['id_number']}")]
                             })
         return Command(goto=goto, update={'next': goto, 
                                         'current_reasoning': response["reasoning"],
-                                        'iteration_count': current_iteration}
+                                        'iteration_count': current_iteration,
+                                        'status': status}
                     )
 
-    def information_node(self, state: AgentState) -> Command[Literal['supervisor']]:
+    def information_node(self, state: AgentState, config: RunnableConfig) -> Command[Literal['supervisor', '__end__']]:
         print("*****************called information node************")
     
         # Enhanced system prompt with intelligent tool selection
@@ -103,9 +132,10 @@ class DoctorAppointmentAgent:
    - If user says "today", use 01-01-2024
    - Format dates as DD-MM-YYYY (e.g., 02-01-2024)
 
-3. **Specialization mapping:**
-   - "dentist" or "a dentist" → use specialization "general_dentist"
+3. **Names and specializations:**
+   - Pass the doctor's name or specialization as the user wrote it (e.g., "dr smith", "a dentist"); the tools match it to the roster
    - User doesn't need to specify exact specialization name
+   - If a tool reports several possible matches, ask the user which one they mean
 
 4. **ONLY ask for clarification if:**
    - User mentioned neither specialization nor doctor name
@@ -113,7 +143,7 @@ class DoctorAppointmentAgent:
 
 5. **DO NOT ask for:**
    - Specific doctor name when user asked about specialization
-   - Specialization type when "dentist" is mentioned (assume general_dentist)
+   - Specialization type when "dentist" is mentioned (the tool treats it as a general dentist)
 
 **Available tools:**
 - check_availability_by_doctor: requires doctor_name and desired_date
@@ -135,11 +165,14 @@ class DoctorAppointmentAgent:
                 ]
             )
         
-        information_agent = create_react_agent(model=self.llm_model,tools=[check_availability_by_doctor,check_availability_by_specialization] ,prompt=system_prompt)
+        tools = [check_availability_by_doctor,check_availability_by_specialization]
+        information_agent = create_react_agent(model=self._agent_model(tools, config),tools=tools ,prompt=system_prompt)
         
         try:
             result = information_agent.invoke(state)
             response_content = result["messages"][-1].content
+        except DeadlineExceeded as e:
+            return self._deadline_finish(e)
         except Exception as e:
             print(f"ERROR in information_node: {e}")
             response_content = "I apologize, but I encountered an error checking availability. Please try rephrasing your query with specific details like the doctor's name or specialization and the desired date."
@@ -153,10 +186,10 @@ class DoctorAppointmentAgent:
             goto="supervisor",
         )
 
-    def booking_node(self, state: AgentState) -> Command[Literal['supervisor']]:
+    def booking_node(self, state: AgentState, config: RunnableConfig) -> Command[Literal['supervisor', '__end__']]:
         print("*****************called booking node************")
     
-        system_prompt = "You are specialized agent to set, cancel or reschedule appointment based on the query. You have access to the tool.\n Make sure to ask user politely if you need any further information to execute the tool.\n For your information, Always consider current year is 2024."
+        system_prompt = "You are specialized agent to set, cancel or reschedule appointment based on the query. You have access to the tool.\n As soon as the user has chosen a doctor, date and time, hold that slot with hold_slot before asking for any missing details, and release it with release_slot if the user changes their mind.\n Booking tools need the doctor's full name; if a tool asks to confirm a name, confirm it with the user and call it again with the full name.\n Make sure to ask user politely if you need any further information to execute the tool.\n For your information, Always consider current year is 2024."
         
         system_prompt = ChatPromptTemplate.from_messages(
                 [
@@ -170,9 +203,13 @@ class DoctorAppointmentAgent:
                     ),
                 ]
             )
-        booking_agent = create_react_agent(model=self.llm_model,tools=[set_appointment,cancel_appointment,reschedule_appointment],prompt=system_prompt)
+        tools = [hold_slot,release_slot,set_appointment,cancel_appointment,reschedule_appointment]
+        booking_agent = create_react_agent(model=self._agent_model(tools, config),tools=tools,prompt=system_prompt)
 
-        result = booking_agent.invoke(state)
+        try:
+            result = booking_agent.invoke(state)
+        except DeadlineExceeded as e:
+            return self._deadline_finish(e)
         
         return Command(
             update={
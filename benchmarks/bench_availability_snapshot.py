@@ -0,0 +1,115 @@
+"""
+Load time and RSS of the availability snapshot vs. pd.read_csv.
+
+Each measurement runs in a fresh interpreter so RSS is not shared between
+runs. "load" is the time to open the data; "load+query" adds one
+check_availability_by_doctor style lookup for a single doctor and day.
+
+Usage:
+    python benchmarks/bench_availability_snapshot.py                 # 4k (real data), 1M and 10M slots
+    python benchmarks/bench_availability_snapshot.py --sizes 4280 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.availability_snapshot import AVAILABILITY_CSV, AvailabilitySnapshot, csv_to_snapshot
+
+QUERY_DOCTOR = "john doe"
+QUERY_DATE = "05-08-2024"
+
+
+def generate_csv(rows: int, path: str):
+    """Synthetic schedule shaped like the real one: 30 minute slots, 8:00-16:30."""
+    source = pd.read_csv(AVAILABILITY_CSV)
+    if rows <= len(source):
+        source.head(rows).to_csv(path, index=False)
+        return
+
+    doctors = source[["doctor_name", "specialization"]].drop_duplicates().reset_index(drop=True)
+    n_doctors = len(doctors)
+    slots_per_day = 18
+    index = np.arange(rows)
+    doctor = index % n_doctors
+    slot = index // n_doctors
+    day = slot // slots_per_day
+    minutes = 8 * 60 + (slot % slots_per_day) * 30
+    start = np.datetime64("2024-08-05T00:00")
+    date_slot = pd.to_datetime(start + day.astype("timedelta64[D]") + minutes.astype("timedelta64[m]")).strftime("%d-%m-%Y %H:%M")
+
+    rng = np.random.default_rng(0)
+    available = rng.random(rows) < 0.5
+    patient = np.where(available, np.nan, rng.integers(1000000, 1000100, rows).astype(float))
+    pd.DataFrame({
+        "date_slot": date_slot,
+        "specialization": doctors["specialization"].to_numpy()[doctor],
+        "doctor_name": doctors["doctor_name"].to_numpy()[doctor],
+        "is_available": available,
+        "patient_to_attend": patient,
+    }).to_csv(path, index=False)
+
+
+def child(kind: str, path: str):
+    import psutil
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    started = time.perf_counter()
+    if kind == "csv":
+        df = pd.read_csv(path)
+        loaded = time.perf_counter()
+        day = df[(df['date_slot'].apply(lambda input: input.split(' ')[0]) == QUERY_DATE) & (df['doctor_name'] == QUERY_DOCTOR)]
+    else:
+        snapshot = AvailabilitySnapshot(path)
+        loaded = time.perf_counter()
+        day = snapshot.day_frame(QUERY_DATE, doctor_name=QUERY_DOCTOR)
+    queried = time.perf_counter()
+    rss = (process.memory_info().rss - rss_before) / 2**20
+    print(f"{loaded - started} {queried - started} {rss} {len(day)}")
+
+
+def measure(kind: str, path: str):
+    output = subprocess.run([sys.executable, __file__, "--child", kind, path], check=True, capture_output=True, text=True).stdout
+    load, query, rss, rows = output.split()
+    return float(load), float(query), float(rss), int(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4280, 1_000_000, 10_000_000])
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'slots':>10} {'format':>8} {'file MB':>8} {'load s':>9} {'load+query s':>13} {'RSS MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            csv_path = os.path.join(workdir, f"availability_{rows}.csv")
+            snap_path = os.path.join(workdir, f"availability_{rows}.snap")
+            generate_csv(rows, csv_path)
+            started = time.perf_counter()
+            csv_to_snapshot(csv_path, snap_path)
+            convert = time.perf_counter() - started
+
+            results = {}
+            for kind, path in (("csv", csv_path), ("snapshot", snap_path)):
+                load, query, rss, matched = measure(kind, path)
+                results[kind] = matched
+                size = os.path.getsize(path) / 2**20
+                print(f"{rows:>10} {kind:>8} {size:>8.1f} {load:>9.4f} {query:>13.4f} {rss:>8.1f}")
+            if results["csv"] != results["snapshot"]:
+                print(f"  !! query mismatch: csv={results['csv']} snapshot={results['snapshot']}")
+            print(f"{'':>10} {'convert':>8} {'':>8} {convert:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import requests
 from datetime import datetime
 
 API_URL = "http://127.0.0.1:8003/execute"
+REQUEST_TIMEOUT = 30
 
 def process_query(user_id, query, history):
     """
@@ -34,10 +35,12 @@ def process_query(user_id, query, history):
             API_URL,
             json={
                 'messages': query,
-                'id_number': user_id_int
+                'id_number': user_id_int,
+                # Leave the server time to return a partial answer before we give up
+                'timeout_seconds': REQUEST_TIMEOUT - 5
             },
             verify=False,
-            timeout=30
+            timeout=REQUEST_TIMEOUT
         )
         
         if response.status_code == 200:
@@ -47,7 +50,10 @@ def process_query(user_id, query, history):
             # Add assistant response to history
             history.append({"role": "assistant", "content": response_text})
             
-            status = f"✅ Response received at {datetime.now().strftime('%H:%M:%S')}"
+            if response_data.get("status") == "deadline_exceeded":
+                status = f"⏱️ Partial response (time limit reached) at {datetime.now().strftime('%H:%M:%S')}"
+            else:
+                status = f"✅ Response received at {datetime.now().strftime('%H:%M:%S')}"
             return history, "", status
         else:
             error_msg = f"Server returned error {response.status_code}"
@@ -1,11 +1,29 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
+import asyncio
+import random
+import secrets
+import tempfile
+from typing import Literal, Optional
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
 from agent import DoctorAppointmentAgent
 from langchain_core.messages import HumanMessage
+from src.utils.deadline import Deadline, DeadlineExceeded, DeadlineCallbackHandler
+from src.toolkit.slot_holds import slot_holds
+from src.admin.schedule_admin import ScheduleBatchError, apply_operations, read_operations
+from src.utils.profiling import PROFILE_SAMPLE_RATE, RequestProfiler, claim_profile_id, profile_path
 import os
 
 os.environ.pop("SSL_CERT_FILE", None)
 
+# Keep the server budget below the Gradio client's 30s timeout
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "25"))
+DISCONNECT_POLL_INTERVAL = 0.5
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
+# Batches larger than this are spooled to disk while they stream in
+BATCH_SPOOL_SIZE = 8 * 2**20
+
 
 app = FastAPI()
 
@@ -13,13 +31,26 @@ app = FastAPI()
 class UserQuery(BaseModel):
     id_number: int
     messages: str
+    timeout_seconds: Optional[float] = Field(default=None, gt=0, description="Request budget in seconds")
 
 agent = DoctorAppointmentAgent()
 
-@app.post("/execute")
-def execute_agent(user_input: UserQuery):
+
+def run_graph(user_input: UserQuery, deadline: Deadline, profiler: Optional[RequestProfiler] = None) -> dict:
+    if profiler is None:
+        return _run_graph(user_input, deadline)
+
+    profiler.start()
+    try:
+        result = _run_graph(user_input, deadline, profiler)
+    finally:
+        summary = profiler.stop()
+    return {**result, "profile": summary}
+
+
+def _run_graph(user_input: UserQuery, deadline: Deadline, profiler: Optional[RequestProfiler] = None) -> dict:
     app_graph = agent.workflow()
-    
+
     # Prepare agent state as expected by the workflow
     input = [
         HumanMessage(content=user_input.messages)
@@ -31,14 +62,112 @@ def execute_agent(user_input: UserQuery):
         "query": "",
         "current_reasoning": "",
         "iteration_count": 0,
-    }  
+        "status": "",
+    }
+    config = {
+        "recursion_limit": 20,
+        "configurable": {"deadline": deadline, "session_id": str(user_input.id_number)},
+        "callbacks": [DeadlineCallbackHandler(deadline)],
+    }
+    if profiler is not None:
+        config["callbacks"].append(profiler.callback)
+
+    # Stream state snapshots so the last one can be returned as a partial answer
+    response = query_data
+    try:
+        for response in app_graph.stream(query_data, config=config, stream_mode="values"):
+            pass
+        status = response.get("status") or "completed"
+    except DeadlineExceeded as e:
+        status = "cancelled" if e.cancelled else "deadline_exceeded"
+    except Exception:
+        # A Groq timeout caused by the budget running out is still a deadline
+        if deadline.cancelled:
+            status = "cancelled"
+        elif deadline.expired():
+            status = "deadline_exceeded"
+        else:
+            raise
 
-    response = app_graph.invoke(query_data,config={"recursion_limit": 20})
-    
     # Extract content from message objects
     user_friendly_response = "\n".join([
-        msg.content if hasattr(msg, 'content') else str(msg) 
+        msg.content if hasattr(msg, 'content') else str(msg)
         for msg in response["messages"]
     ])
-    
-    return {"response": user_friendly_response}
\ No newline at end of file
+
+    return {"response": user_friendly_response, "status": status}
+
+
+def _profiler_for(request: Request, profile: bool, x_profile: Optional[str]) -> Optional[RequestProfiler]:
+    # Profile on request (?profile=true or X-Profile: 1) or for a random sample of traffic
+    requested = profile or (x_profile or "").lower() in ("1", "true", "yes")
+    if not requested and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+        return None
+    return RequestProfiler(claim_profile_id(request.headers.get("x-request-id", "")))
+
+
+def _require_admin(x_admin_token: Optional[str]):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API is disabled, set ADMIN_API_TOKEN to enable it")
+    if not secrets.compare_digest(x_admin_token or "", ADMIN_API_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.post("/execute")
+async def execute_agent(user_input: UserQuery, request: Request, profile: bool = False, x_profile: Optional[str] = Header(default=None)):
+    deadline = Deadline(user_input.timeout_seconds or DEFAULT_REQUEST_TIMEOUT)
+    profiler = _profiler_for(request, profile, x_profile)
+    task = asyncio.ensure_future(run_in_threadpool(run_graph, user_input, deadline, profiler))
+
+    # If the client goes away, stop waiting for the graph and cancel it at its next checkpoint
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if not task.done() and await request.is_disconnected():
+            print("!!!! CLIENT DISCONNECTED - CANCELLING REQUEST !!!!")
+            deadline.cancel()
+            task.add_done_callback(_log_abandoned_run)
+            return {"response": "", "status": "cancelled"}
+
+    return await task
+
+
+def _log_abandoned_run(task: asyncio.Future):
+    # Nobody awaits a run whose client disconnected; retrieve its error so it is not lost
+    if not task.cancelled() and task.exception() is not None:
+        print(f"!!!! CANCELLED REQUEST FAILED: {task.exception()!r} !!!!")
+
+
+@app.get("/profiles/{request_id}")
+def get_profile(request_id: str, summary: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    path = profile_path(request_id, ".json" if summary else ".folded")
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json" if summary else "text/plain")
+
+
+@app.get("/metrics/holds")
+def hold_metrics():
+    return slot_holds.stats()
+
+
+@app.post("/admin/schedule/batch")
+async def schedule_batch(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    dry_run: bool = False,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    _require_admin(x_admin_token)
+
+    format = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    with tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_SIZE) as batch:
+        async for chunk in request.stream():
+            batch.write(chunk)
+        batch.seek(0)
+        try:
+            return await run_in_threadpool(lambda: apply_operations(read_operations(batch, format), dry_run=dry_run))
+        except ScheduleBatchError as e:
+            raise HTTPException(status_code=422, detail={"message": f"{e}, nothing was written", "errors": e.errors[:100]})
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Could not read batch: {e}")
@@ -0,0 +1,225 @@
+"""
+Bulk schedule administration for clinic staff.
+
+A batch is a stream of operations in CSV or NDJSON with these fields:
+    op              add | block | cancel
+    doctor_name     required for add and block, optional filter for cancel
+    specialization  add only; may be omitted for doctors already on the schedule
+    date_slot       add: the new slot; cancel: a single slot ('DD-MM-YYYY HH:MM')
+    start, end      block and cancel: inclusive slot range ('DD-MM-YYYY HH:MM')
+    id_number       cancel only: the patient whose appointments are cancelled
+
+The whole batch is validated first with the DateTimeModel and
+IdentificationNumberModel rules; if any row is invalid nothing is written.
+Otherwise operations are applied with vectorized pandas operations in the
+order add, cancel, block, and the schedule is written once, atomically. The
+availability snapshot is rebuilt right away so chat requests do not pay for it.
+
+Usage:
+    python -m src.admin.schedule_admin operations.ndjson
+    cat operations.csv | python -m src.admin.schedule_admin - --format csv --dry-run
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from src.data_models.models import DATE_TIME_ERROR, DATE_TIME_PATTERN, ID_NUMBER_ERROR, ID_NUMBER_PATTERN
+from src.utils.availability_snapshot import AVAILABILITY_CSV, DATE_FORMAT, csv_to_snapshot
+
+OPERATIONS = ("add", "block", "cancel")
+OPERATION_COLUMNS = ["op", "doctor_name", "specialization", "date_slot", "start", "end", "id_number"]
+
+_write_lock = threading.Lock()
+
+
+class ScheduleBatchError(ValueError):
+    """Raised when a batch has invalid operations. Nothing has been written."""
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        super().__init__(f"{len(errors)} invalid operation(s) in batch")
+
+
+def read_operations(source, format: str = "ndjson") -> pd.DataFrame:
+    """Read a batch from a path or binary file object into a normalized DataFrame."""
+    if format == "csv":
+        ops = pd.read_csv(source, dtype=str, keep_default_na=False)
+    elif format == "ndjson":
+        ops = pd.read_json(source, lines=True, dtype=False)
+    else:
+        raise ValueError(f"Unsupported batch format: {format}")
+
+    ops = ops.reindex(columns=OPERATION_COLUMNS).reset_index(drop=True)
+    for column in OPERATION_COLUMNS:
+        if column != "id_number":
+            ops[column] = ops[column].fillna("").astype(str).str.strip()
+    for column in ("op", "doctor_name", "specialization"):
+        ops[column] = ops[column].str.lower()
+
+    # A single date_slot on a cancel is the same as a one-slot range
+    single = (ops["op"] == "cancel") & (ops["date_slot"] != "") & (ops["start"] == "") & (ops["end"] == "")
+    ops.loc[single, ["start", "end"]] = ops.loc[single, ["date_slot", "date_slot"]].to_numpy()
+    return ops
+
+
+def _parse_slots(values: pd.Series) -> pd.Series:
+    valid = values.str.match(DATE_TIME_PATTERN)
+    return pd.to_datetime(values.where(valid), format=DATE_FORMAT, errors="coerce")
+
+
+def _parse_ids(values: pd.Series) -> pd.Series:
+    ids = pd.to_numeric(values.replace("", np.nan), errors="coerce")
+    whole = ids.notna() & (ids % 1 == 0)
+    ids = ids.where(whole).astype("Int64")
+    valid = ids.astype(str).str.match(ID_NUMBER_PATTERN)
+    return ids.where(valid.fillna(False).astype(bool))
+
+
+def validate_operations(ops: pd.DataFrame, schedule: pd.DataFrame) -> list:
+    """Return a list of {'line', 'error'} dicts; empty when the batch is valid."""
+    errors = []
+
+    def reject(mask, message):
+        for line in ops.index[mask]:
+            errors.append({"line": int(line) + 1, "error": message})
+
+    is_add, is_block, is_cancel = (ops["op"] == op for op in OPERATIONS)
+    reject(~(is_add | is_block | is_cancel), f"op must be one of {', '.join(OPERATIONS)}")
+
+    slot, start, end, ids = _parse_slots(ops["date_slot"]), _parse_slots(ops["start"]), _parse_slots(ops["end"]), _parse_ids(ops["id_number"])
+    # Adds are applied before blocks, so a batch may block days of a doctor it adds
+    known_doctors = set(schedule["doctor_name"]) | set(ops.loc[is_add & slot.notna() & (ops["doctor_name"] != ""), "doctor_name"])
+
+    reject(is_add & slot.isna(), DATE_TIME_ERROR)
+    reject((is_block | is_cancel) & (start.isna() | end.isna()), DATE_TIME_ERROR)
+    reject((is_block | is_cancel) & (start > end), "start must not be after end")
+    reject((is_add | is_block) & (ops["doctor_name"] == ""), "doctor_name is required")
+    reject(is_block & (ops["doctor_name"] != "") & ~ops["doctor_name"].isin(known_doctors), "Unknown doctor")
+    reject(is_cancel & ids.isna(), ID_NUMBER_ERROR)
+
+    # New slots need a specialization, and must agree with the schedule's one for known doctors
+    doctor_specialization = schedule.drop_duplicates("doctor_name").set_index("doctor_name")["specialization"]
+    existing = ops["doctor_name"].map(doctor_specialization)
+    reject(is_add & (ops["specialization"] == "") & existing.isna(), "specialization is required for a new doctor")
+    reject(is_add & (ops["specialization"] != "") & existing.notna() & (ops["specialization"] != existing), "specialization does not match the schedule")
+
+    # Slots must be new, both against the schedule and within the batch; malformed rows are already reported
+    added = pd.MultiIndex.from_arrays([ops["doctor_name"], ops["date_slot"]])
+    current = pd.MultiIndex.from_arrays([schedule["doctor_name"], schedule["date_slot"]])
+    well_formed = is_add & slot.notna() & (ops["doctor_name"] != "")
+    repeated = pd.Series(False, index=ops.index)
+    repeated[well_formed] = added[well_formed.to_numpy()].duplicated()
+    reject(well_formed & added.isin(current), "Slot already exists")
+    reject(repeated & ~added.isin(current), "Slot appears more than once in the batch")
+
+    return sorted(errors, key=lambda error: error["line"])
+
+
+def _rows_in_ranges(schedule: pd.DataFrame, slot_time: pd.Series, ranges: pd.DataFrame, left_on: str, right_on: str) -> np.ndarray:
+    """Index of schedule rows inside any of the [start_time, end_time] ranges joined to them."""
+    if ranges.empty:
+        return np.array([], dtype=int)
+    rows = schedule[["doctor_name", "patient_to_attend"]].assign(row=schedule.index, slot_time=slot_time)
+    merged = rows.merge(ranges, left_on=left_on, right_on=right_on)
+    inside = (merged["slot_time"] >= merged["start_time"]) & (merged["slot_time"] <= merged["end_time"])
+    if "doctor_filter" in merged:
+        inside &= (merged["doctor_filter"] == "") | (merged["doctor_filter"] == merged["doctor_name"])
+    return merged.loc[inside, "row"].unique()
+
+
+def apply_operations(ops: pd.DataFrame, csv_path: str = AVAILABILITY_CSV, dry_run: bool = False) -> dict:
+    """
+    Validate and apply a batch to the schedule in one atomic write.
+    Raises ScheduleBatchError without touching the schedule if any row is invalid.
+    """
+    started = time.perf_counter()
+    with _write_lock:
+        schedule = pd.read_csv(csv_path)
+        errors = validate_operations(ops, schedule)
+        if errors:
+            raise ScheduleBatchError(errors)
+
+        # add
+        adds = ops[ops["op"] == "add"]
+        doctor_specialization = schedule.drop_duplicates("doctor_name").set_index("doctor_name")["specialization"]
+        new_rows = pd.DataFrame({
+            "date_slot": adds["date_slot"],
+            "specialization": adds["specialization"].where(adds["specialization"] != "", adds["doctor_name"].map(doctor_specialization)),
+            "doctor_name": adds["doctor_name"],
+            "is_available": True,
+            "patient_to_attend": np.nan,
+        })
+        schedule = pd.concat([schedule, new_rows], ignore_index=True)
+        slot_time = pd.to_datetime(schedule["date_slot"], format=DATE_FORMAT)
+
+        # cancel: free every slot of the listed patients inside their ranges
+        cancels = ops[ops["op"] == "cancel"]
+        cancel_ranges = pd.DataFrame({
+            "patient": _parse_ids(cancels["id_number"]).astype(float),
+            "doctor_filter": cancels["doctor_name"],
+            "start_time": _parse_slots(cancels["start"]),
+            "end_time": _parse_slots(cancels["end"]),
+        })
+        cancelled = _rows_in_ranges(schedule, slot_time, cancel_ranges, "patient_to_attend", "patient")
+        schedule.loc[cancelled, ["is_available", "patient_to_attend"]] = [True, np.nan]
+
+        # block: make every free slot of the doctor inside the range unavailable
+        blocks = ops[ops["op"] == "block"]
+        block_ranges = pd.DataFrame({
+            "block_doctor": blocks["doctor_name"],
+            "start_time": _parse_slots(blocks["start"]),
+            "end_time": _parse_slots(blocks["end"]),
+        })
+        in_block = _rows_in_ranges(schedule, slot_time, block_ranges, "doctor_name", "block_doctor")
+        blocked = in_block[schedule.loc[in_block, "is_available"].to_numpy(dtype=bool)] if len(in_block) else in_block
+        schedule.loc[blocked, "is_available"] = False
+
+        if not dry_run:
+            directory = os.path.dirname(os.path.abspath(csv_path))
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False, newline="") as f:
+                schedule.to_csv(f, index=False)
+            os.replace(f.name, csv_path)
+            # Rebuild under the write lock; get_snapshot then only reopens the newer file
+            csv_to_snapshot(csv_path)
+
+    elapsed = time.perf_counter() - started
+    affected = len(new_rows) + len(cancelled) + len(blocked)
+    return {
+        "operations": len(ops),
+        "added": len(new_rows),
+        "cancelled": len(cancelled),
+        "blocked": len(blocked),
+        "slots_affected": affected,
+        "dry_run": dry_run,
+        "seconds": round(elapsed, 4),
+        "slots_per_second": round(affected / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a batch of schedule operations in one transaction.")
+    parser.add_argument("batch", help="CSV or NDJSON file with operations, '-' for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension, ndjson for stdin")
+    parser.add_argument("--schedule", default=AVAILABILITY_CSV, help="availability CSV to update")
+    parser.add_argument("--dry-run", action="store_true", help="validate and apply in memory without writing")
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.batch.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin.buffer if args.batch == "-" else args.batch
+    try:
+        summary = apply_operations(read_operations(source, format), args.schedule, dry_run=args.dry_run)
+    except ScheduleBatchError as e:
+        print(f"❌ {e}, nothing was written:")
+        for error in e.errors[:50]:
+            print(f"  line {error['line']}: {error['error']}")
+        sys.exit(1)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
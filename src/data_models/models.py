@@ -1,14 +1,19 @@
 import re 
 from pydantic import BaseModel , field_validator , Field
 
+DATE_TIME_PATTERN = r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$'
+ID_NUMBER_PATTERN = r'^\d{7,8}$'
+DATE_TIME_ERROR = "The date should be in format 'DD-MM-YYYY HH:MM'"
+ID_NUMBER_ERROR = "The ID number should be a 7 or 8-digit number"
+
 
 class DateTimeModel (BaseModel) :
-    date : str = Field(description= "Properly formatted date " ,pattern=r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$')
+    date : str = Field(description= "Properly formatted date " ,pattern=DATE_TIME_PATTERN)
 
     @field_validator("date")
     def check_format_date(cls, v):
-        if not re.match(r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$', v):  # Ensures 'DD-MM-YYYY HH:MM' format
-            raise ValueError("The date should be in format 'DD-MM-YYYY HH:MM'")
+        if not re.match(DATE_TIME_PATTERN, v):  # Ensures 'DD-MM-YYYY HH:MM' format
+            raise ValueError(DATE_TIME_ERROR)
         return v
 
 
@@ -25,6 +30,6 @@ class IdentificationNumberModel(BaseModel):
     id: int = Field(description="Identification number (7 or 8 digits long)")
     @field_validator("id")
     def check_format_id(cls, v):
-        if not re.match(r'^\d{7,8}$', str(v)):  # Convert to string before matching
-            raise ValueError("The ID number should be a 7 or 8-digit number")
+        if not re.match(ID_NUMBER_PATTERN, str(v)):  # Convert to string before matching
+            raise ValueError(ID_NUMBER_ERROR)
         return v
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Doctor and specialization registry built from the availability data.
+
+Tools take names as the user typed them ("dr smith", "Jane Smyth",
+"orthodontists") and resolve them here, so the tool schemas sent to the LLM
+stay the same size however many doctors are on the roster.
+
+Resolution: exact match on the normalized name, otherwise candidates sharing
+trigrams or a whole word with the query are ranked by edit distance. A match
+is returned only when it is close enough and clearly ahead of the runner-up;
+otherwise the closest names are returned so the agent can ask the user.
+With exact=True (used before writing to the schedule) only exact matches are
+returned and a fuzzy match comes back as the single candidate to confirm.
+Names are picked out of free text by exact match only, since every short
+window of a sentence would otherwise be a near miss for something.
+"""
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from src.utils.availability_snapshot import AVAILABILITY_CSV, get_snapshot
+
+MATCH_THRESHOLD = 0.75
+SUGGESTION_THRESHOLD = 0.5
+AMBIGUITY_MARGIN = 0.05
+MAX_CANDIDATES = 20
+
+# Common ways users refer to a specialization that are not close to its name
+SPECIALIZATION_ALIASES = {
+    "dentist": "general_dentist",
+    "children's dentist": "pediatric_dentist",
+    "kids dentist": "pediatric_dentist",
+    "braces": "orthodontist",
+    "implants": "prosthodontist",
+}
+
+_TITLES = {"dr", "doctor", "prof", "professor"}
+
+
+class Resolution(NamedTuple):
+    match: Optional[str]
+    candidates: List[str]
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, drop punctuation and titles such as 'Dr.'."""
+    words = re.sub(r"[^a-z0-9' ]+", " ", str(text).lower().replace("_", " ")).split()
+    return " ".join(word for word in words if word not in _TITLES)
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+class FuzzyIndex:
+    """Trigram and word index over normalized names, mapping each to a canonical key."""
+
+    def __init__(self, names: Dict[str, str]):
+        # names: normalized name -> canonical key (several names may share a key)
+        self.names = list(names)
+        self.keys = [names[name] for name in self.names]
+        self._exact = {name: i for i, name in enumerate(self.names)}
+        self._trigrams = defaultdict(list)
+        self._words = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for trigram in _trigrams(name):
+                self._trigrams[trigram].append(i)
+            for word in name.split():
+                self._words[word].append(i)
+
+    def _score(self, query: str, i: int) -> float:
+        name = self.names[i]
+        score = similarity(query, name)
+        if " " not in query:
+            # A single word ("smith", "kevin") is compared with each word of the name
+            score = max(score, 0.95 * max(similarity(query, word) for word in name.split()))
+        else:
+            # Word order should not matter ("smith jane")
+            score = max(score, similarity(" ".join(sorted(query.split())), " ".join(sorted(name.split()))))
+        return score
+
+    def lookup(self, normalized: str) -> Optional[str]:
+        """Key for an exact (already normalized) name or alias, else None."""
+        i = self._exact.get(normalized)
+        return None if i is None else self.keys[i]
+
+    def resolve(self, text: str, exact: bool = False) -> Resolution:
+        query = normalize_name(text)
+        if not query:
+            return Resolution(None, [])
+        if query in self._exact:
+            return Resolution(self.keys[self._exact[query]], [])
+
+        shared = Counter()
+        for trigram in _trigrams(query):
+            shared.update(self._trigrams.get(trigram, ()))
+        candidates = {i for i, _ in shared.most_common(MAX_CANDIDATES)}
+        for word in query.split():
+            candidates.update(self._words.get(word, ()))
+
+        # Best score per canonical key, so aliases of one key do not compete with each other
+        scores = {}
+        for i in candidates:
+            scores[self.keys[i]] = max(scores.get(self.keys[i], 0.0), self._score(query, i))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return Resolution(None, [])
+
+        best_key, best_score = ranked[0]
+        close = [key for key, score in ranked if score >= max(SUGGESTION_THRESHOLD, best_score - AMBIGUITY_MARGIN)]
+        if best_score >= MATCH_THRESHOLD and len(close) == 1 and not exact:
+            return Resolution(best_key, [])
+        return Resolution(None, close[:5])
+
+
+class DoctorRegistry:
+    def __init__(self, doctor_specializations: Dict[str, str]):
+        self.doctor_specializations = doctor_specializations
+        self.doctors = sorted(doctor_specializations)
+        self.specializations = sorted(set(doctor_specializations.values()))
+        self._doctor_index = FuzzyIndex({normalize_name(name): name for name in self.doctors})
+
+        specialization_names = {}
+        names = [(specialization, specialization) for specialization in self.specializations]
+        names += [(alias, specialization) for alias, specialization in SPECIALIZATION_ALIASES.items() if specialization in self.specializations]
+        for name, specialization in names:
+            specialization_names[normalize_name(name)] = specialization
+            # 'orthodontists', 'oral surgeons'
+            specialization_names[normalize_name(name) + "s"] = specialization
+        self._specialization_index = FuzzyIndex(specialization_names)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "DoctorRegistry":
+        # Unique (doctor, specialization) code pairs, without materializing any strings per row
+        pairs = np.unique(snapshot.doctor.astype(np.uint32) << 8 | snapshot.specialization)
+        return cls({snapshot.doctors[pair >> 8]: snapshot.specializations[pair & 0xFF] for pair in pairs.tolist()})
+
+    def resolve_doctor(self, name: str, exact: bool = False) -> Resolution:
+        return self._doctor_index.resolve(name, exact)
+
+    def resolve_specialization(self, name: str) -> Resolution:
+        return self._specialization_index.resolve(name)
+
+    def specialization_of(self, doctor_name: str) -> Optional[str]:
+        return self.doctor_specializations.get(doctor_name)
+
+    def _find_in_text(self, index: FuzzyIndex, text: str, max_words: int) -> Optional[str]:
+        # Exact names and aliases only, longest word windows first so "oral surgeon" wins over "surgeon"
+        words = normalize_name(text).split()
+        for size in range(min(max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                match = index.lookup(" ".join(words[start:start + size]))
+                if match:
+                    return match
+        return None
+
+    def find_doctor_in_text(self, text: str) -> Optional[str]:
+        return self._find_in_text(self._doctor_index, text, max_words=3)
+
+    def find_specialization_in_text(self, text: str) -> Optional[str]:
+        return self._find_in_text(self._specialization_index, text, max_words=2)
+
+
+_registry_lock = threading.Lock()
+_registry_cache = {}
+
+
+def get_registry(csv_path: str = AVAILABILITY_CSV) -> DoctorRegistry:
+    """Registry for the current schedule, rebuilt whenever its snapshot is."""
+    snapshot = get_snapshot(csv_path)
+    with _registry_lock:
+        cached = _registry_cache.get(csv_path)
+        if cached is None or cached[0] is not snapshot:
+            cached = (snapshot, DoctorRegistry.from_snapshot(snapshot))
+            _registry_cache[csv_path] = cached
+        return cached[1]
@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+HOLD_TTL_SECONDS = float(os.getenv("SLOT_HOLD_TTL_SECONDS", "300"))
+
+SlotKey = Tuple[str, str]  # (doctor_name, 'DD-MM-YYYY HH:MM')
+
+
+@dataclass
+class SlotHold:
+    slot: SlotKey
+    session_id: str
+    expires_at: float
+
+
+class SlotHoldManager:
+    """
+    Short-lived slot reservations for multi-turn bookings.
+
+    A held slot is hidden from other sessions' availability results until it is
+    confirmed, released or expires. Expiry uses a min-heap keyed on the expiry
+    time, so only holds that are actually due are touched; refreshed or released
+    holds leave stale heap entries that are skipped when popped. Active holds are
+    also indexed by (doctor_name, day), so an availability lookup only looks at
+    the holds for the doctors and day it returns.
+    """
+
+    def __init__(self, ttl: float = HOLD_TTL_SECONDS, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._holds: Dict[SlotKey, SlotHold] = {}
+        self._by_day: Dict[Tuple[str, str], set] = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self.metrics = {"created": 0, "refreshed": 0, "confirmed": 0, "released": 0, "expired": 0, "conflicts": 0}
+
+    @staticmethod
+    def _day_key(slot: SlotKey) -> Tuple[str, str]:
+        return slot[0], slot[1].split(" ")[0]
+
+    def _remove(self, slot: SlotKey):
+        del self._holds[slot]
+        day_key = self._day_key(slot)
+        slots = self._by_day[day_key]
+        slots.discard(slot)
+        if not slots:
+            del self._by_day[day_key]
+
+    def _expire(self):
+        now = self._clock()
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, slot = heapq.heappop(self._heap)
+            hold = self._holds.get(slot)
+            # Skip entries superseded by a refresh, release or confirmation
+            if hold is not None and hold.expires_at == expires_at:
+                self._remove(slot)
+                self.metrics["expired"] += 1
+
+    def hold(self, slot: SlotKey, session_id: str, ttl: Optional[float] = None) -> Optional[SlotHold]:
+        """Reserve a slot for a session. Returns None if another session holds it."""
+        with self._lock:
+            self._expire()
+            current = self._holds.get(slot)
+            if current is not None and current.session_id != session_id:
+                self.metrics["conflicts"] += 1
+                return None
+            expires_at = self._clock() + (ttl if ttl is not None else self.ttl)
+            self._holds[slot] = SlotHold(slot, session_id, expires_at)
+            self._by_day.setdefault(self._day_key(slot), set()).add(slot)
+            heapq.heappush(self._heap, (expires_at, next(self._seq), slot))
+            self.metrics["refreshed" if current is not None else "created"] += 1
+            return self._holds[slot]
+
+    def holder(self, slot: SlotKey) -> Optional[str]:
+        with self._lock:
+            self._expire()
+            hold = self._holds.get(slot)
+            return hold.session_id if hold is not None else None
+
+    def is_held_by_other(self, slot: SlotKey, session_id: Optional[str]) -> bool:
+        holder = self.holder(slot)
+        return holder is not None and holder != session_id
+
+    def held_by_others(self, session_id: Optional[str], day: str, doctor_names: Iterable[str]) -> set:
+        """Slots of these doctors on this day ('DD-MM-YYYY') to hide from this session's availability results."""
+        with self._lock:
+            self._expire()
+            return {
+                slot
+                for doctor_name in doctor_names
+                for slot in self._by_day.get((doctor_name, day), ())
+                if self._holds[slot].session_id != session_id
+            }
+
+    def confirm(self, slot: SlotKey, session_id: str) -> bool:
+        """Turn the session's hold into a booking. Returns False if it held nothing."""
+        with self._lock:
+            self._expire()
+            hold = self._holds.get(slot)
+            if hold is None or hold.session_id != session_id:
+                return False
+            self._remove(slot)
+            self.metrics["confirmed"] += 1
+            return True
+
+    def release(self, slot: SlotKey, session_id: str) -> bool:
+        with self._lock:
+            self._expire()
+            hold = self._holds.get(slot)
+            if hold is None or hold.session_id != session_id:
+                return False
+            self._remove(slot)
+            self.metrics["released"] += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire()
+            finished = self.metrics["confirmed"] + self.metrics["released"] + self.metrics["expired"]
+            return {
+                **self.metrics,
+                "active": len(self._holds),
+                "conversion_rate": self.metrics["confirmed"] / finished if finished else 0.0,
+                "expiry_rate": self.metrics["expired"] / finished if finished else 0.0,
+            }
+
+
+slot_holds = SlotHoldManager()
@@ -1,11 +1,54 @@
 import pandas as pd
-from typing import  Literal
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
 from src.data_models.models import *
+from src.toolkit.slot_holds import slot_holds
+from src.utils.availability_snapshot import get_snapshot
+from src.toolkit.doctor_registry import get_registry
+
+
+def _session_id(config: RunnableConfig):
+    # The patient's id number identifies the booking session across turns
+    return (config or {}).get("configurable", {}).get("session_id")
+
+
+def _hide_held_slots(df, desired_date: str, config: RunnableConfig):
+    # Only the holds for the doctors and day in this result are looked at
+    held = slot_holds.held_by_others(_session_id(config), desired_date, df['doctor_name'].unique())
+    if not held:
+        return df
+    return df[~pd.MultiIndex.from_arrays([df['doctor_name'], df['date_slot']]).isin(list(held))]
+
+
+def _unresolved(kind: str, name: str, candidates: list) -> str:
+    options = [candidate.replace('_', ' ').title() for candidate in candidates]
+    if len(options) == 1:
+        return f"No {kind} found matching '{name}'. Did the user mean {options[0]}? Please confirm with the user."
+    if options:
+        return f"'{name}' could match several {kind}s: {', '.join(options)}. Please ask the user which one they mean."
+    return f"No {kind} found matching '{name}'. Please check the name with the user."
+
+
+def _resolve_doctor(doctor_name: str, exact: bool = False):
+    """
+    Return (roster name, None) or (None, message for the agent).
+    Tools that change the schedule pass exact=True so a near miss is confirmed with the user first.
+    """
+    resolution = get_registry().resolve_doctor(doctor_name, exact)
+    if resolution.match:
+        return resolution.match, None
+    return None, _unresolved("doctor", doctor_name, resolution.candidates)
+
+
+def _resolve_specialization(specialization: str):
+    resolution = get_registry().resolve_specialization(specialization)
+    if resolution.match:
+        return resolution.match, None
+    return None, _unresolved("specialization", specialization, resolution.candidates)
 
 
 @tool
-def check_availability_by_doctor(desired_date: str, doctor_name: Literal['kevin anderson','robert martinez','susan davis','daniel miller','sarah wilson','michael green','lisa brown','jane smith','emily johnson','john doe']):
+def check_availability_by_doctor(desired_date: str, doctor_name: str, config: RunnableConfig):
     """
     Check availability for a SPECIFIC DOCTOR by name.
     Use this tool when the user mentions a specific doctor's name.
@@ -13,15 +56,19 @@ def check_availability_by_doctor(desired_date: str, doctor_name: Literal['kevin
     
     Parameters:
     - desired_date: Date in DD-MM-YYYY format (e.g., "02-01-2024")
-    - doctor_name: Exact doctor name from the list (lowercase)
+    - doctor_name: Doctor's name as the user gave it (e.g., "dr smith", "Jane Smith")
     """
     try:
         # Validate date format
         import re
         if not re.match(r'^\d{2}-\d{2}-\d{4}$', desired_date):
             return f"Invalid date format. Please use DD-MM-YYYY format (e.g., 02-01-2024)"
+
+        doctor_name, error = _resolve_doctor(doctor_name)
+        if error:
+            return error
         
-        df = pd.read_csv(r"data/doctor_availability.csv")
+        df = _hide_held_slots(get_snapshot().day_frame(desired_date, doctor_name=doctor_name), desired_date, config)
         
         df['date_slot_time'] = df['date_slot'].apply(lambda input: input.split(' ')[-1])
         
@@ -37,7 +84,7 @@ def check_availability_by_doctor(desired_date: str, doctor_name: Literal['kevin
     except Exception as e:
         return f"Error checking doctor availability: {str(e)}"
 @tool
-def check_availability_by_specialization(desired_date: str, specialization: Literal["general_dentist", "cosmetic_dentist", "prosthodontist", "pediatric_dentist","emergency_dentist","oral_surgeon","orthodontist"]):
+def check_availability_by_specialization(desired_date: str, specialization: str, config: RunnableConfig):
     """
     Check availability by SPECIALIZATION (e.g., dentist type).
     Use this tool when the user asks about a type/specialization without mentioning a specific doctor.
@@ -45,24 +92,19 @@ def check_availability_by_specialization(desired_date: str, specialization: Lite
     
     Parameters:
     - desired_date: Date in DD-MM-YYYY format as a string (e.g., "02-01-2024")
-    - specialization: One of the specialization types (use 'general_dentist' for just 'dentist')
-    
-    Specializations:
-    - general_dentist: general dental care (use this for "dentist")
-    - cosmetic_dentist: cosmetic procedures
-    - orthodontist: braces and alignment
-    - pediatric_dentist: children's dentistry
-    - oral_surgeon: surgical procedures
-    - prosthodontist: prosthetics and implants
-    - emergency_dentist: emergency care
+    - specialization: Specialization as the user gave it (e.g., "dentist", "orthodontist", "oral surgeon")
     """
     try:
         # Validate date format
         import re
         if not re.match(r'^\d{2}-\d{2}-\d{4}$', desired_date):
             return f"Invalid date format. Please use DD-MM-YYYY format (e.g., 02-01-2024)"
+
+        specialization, error = _resolve_specialization(specialization)
+        if error:
+            return error
         
-        df = pd.read_csv(r"data/doctor_availability.csv")
+        df = _hide_held_slots(get_snapshot().day_frame(desired_date, specialization=specialization), desired_date, config)
         df['date_slot_time'] = df['date_slot'].apply(lambda input: input.split(' ')[-1])
         rows = df[(df['date_slot'].apply(lambda input: input.split(' ')[0]) == desired_date) & (df['specialization'] == specialization) & (df['is_available'] == True)].groupby(['specialization', 'doctor_name'])['date_slot_time'].apply(list).reset_index(name='available_slots')
     
@@ -85,11 +127,51 @@ def check_availability_by_specialization(desired_date: str, specialization: Lite
     except Exception as e:
         return f"Error checking specialization availability: {str(e)}"
 @tool
-def set_appointment(desired_date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:Literal['kevin anderson','robert martinez','susan davis','daniel miller','sarah wilson','michael green','lisa brown','jane smith','emily johnson','john doe']):
+def hold_slot(desired_date:DateTimeModel, doctor_name:str, config: RunnableConfig):
+    """
+    Temporarily hold a slot with the doctor while collecting the remaining booking details.
+    Use this as soon as the user picks a date, time and doctor, before set_appointment.
+    The hold expires automatically if the appointment is not set in time.
+    doctor_name must be the doctor's full name.
+    """
+    doctor_name, error = _resolve_doctor(doctor_name, exact=True)
+    if error:
+        return error
+    df = get_snapshot().day_frame(desired_date.date.split(' ')[0], doctor_name=doctor_name)
+    case = df[(df['date_slot'] == desired_date.date)&(df['doctor_name'] == doctor_name)&(df['is_available'] == True)]
+    if len(case) == 0:
+        return "No available appointments for that particular case"
+    hold = slot_holds.hold((doctor_name, desired_date.date), _session_id(config))
+    if hold is None:
+        return "That slot is currently being booked by another patient, please choose another time"
+    ttl = slot_holds.ttl
+    duration = f"{int(ttl // 60)} minutes" if ttl >= 60 else f"{int(ttl)} seconds"
+    return f"Slot with Dr. {doctor_name.title()} on {desired_date.date} held for {duration}"
+@tool
+def release_slot(desired_date:DateTimeModel, doctor_name:str, config: RunnableConfig):
+    """
+    Release a slot previously held with hold_slot when the user no longer wants it.
+    """
+    doctor_name, error = _resolve_doctor(doctor_name)
+    if error:
+        return error
+    if slot_holds.release((doctor_name, desired_date.date), _session_id(config)):
+        return "Slot released"
+    return "There is no hold on that slot"
+@tool
+def set_appointment(desired_date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:str, config: RunnableConfig):
     """
     Set appointment or slot with the doctor.
     The parameters MUST be mentioned by the user in the query.
+    doctor_name must be the doctor's full name.
     """
+    doctor_name, error = _resolve_doctor(doctor_name, exact=True)
+    if error:
+        return error
+    slot = (doctor_name, desired_date.date)
+    if slot_holds.is_held_by_other(slot, _session_id(config)):
+        return "That slot is currently being booked by another patient, please choose another time"
+
     df = pd.read_csv(r"doctor_availability.csv")
    
     from datetime import datetime
@@ -103,18 +185,24 @@ def set_appointment(desired_date:DateTimeModel, id_number:IdentificationNumberMo
     
     case = df[(df['date_slot'] == convert_datetime_format(desired_date.date))&(df['doctor_name'] == doctor_name)&(df['is_available'] == True)]
     if len(case) == 0:
+        slot_holds.release(slot, _session_id(config))
         return "No available appointments for that particular case"
     else:
         df.loc[(df['date_slot'] == convert_datetime_format(desired_date.date))&(df['doctor_name'] == doctor_name) & (df['is_available'] == True), ['is_available','patient_to_attend']] = [False, id_number.id]
         df.to_csv(f'availability.csv', index = False)
+        slot_holds.confirm(slot, _session_id(config))
 
-        return "Successfully done"
+        return f"Successfully booked with Dr. {doctor_name.title()} on {desired_date.date}"
 @tool
-def cancel_appointment(date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:Literal['kevin anderson','robert martinez','susan davis','daniel miller','sarah wilson','michael green','lisa brown','jane smith','emily johnson','john doe']):
+def cancel_appointment(date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:str):
     """
     Canceling an appointment.
     The parameters MUST be mentioned by the user in the query.
+    doctor_name must be the doctor's full name.
     """
+    doctor_name, error = _resolve_doctor(doctor_name, exact=True)
+    if error:
+        return error
     df = pd.read_csv(r"doctor_availability.csv")
     case_to_remove = df[(df['date_slot'] == date.date)&(df['patient_to_attend'] == id_number.id)&(df['doctor_name'] == doctor_name)]
     if len(case_to_remove) == 0:
@@ -123,19 +211,23 @@ def cancel_appointment(date:DateTimeModel, id_number:IdentificationNumberModel,
         df.loc[(df['date_slot'] == date.date) & (df['patient_to_attend'] == id_number.id) & (df['doctor_name'] == doctor_name), ['is_available', 'patient_to_attend']] = [True, None]
         df.to_csv(f'availability.csv', index = False)
 
-        return "Successfully cancelled"
+        return f"Successfully cancelled the appointment with Dr. {doctor_name.title()} on {date.date}"
 @tool
-def reschedule_appointment(old_date:DateTimeModel, new_date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:Literal['kevin anderson','robert martinez','susan davis','daniel miller','sarah wilson','michael green','lisa brown','jane smith','emily johnson','john doe']):
+def reschedule_appointment(old_date:DateTimeModel, new_date:DateTimeModel, id_number:IdentificationNumberModel, doctor_name:str, config: RunnableConfig):
     """
     Rescheduling an appointment.
     The parameters MUST be mentioned by the user in the query.
+    doctor_name must be the doctor's full name.
     """
+    doctor_name, error = _resolve_doctor(doctor_name, exact=True)
+    if error:
+        return error
     #Dummy data
     df = pd.read_csv(r"doctor_availability.csv")
     available_for_desired_date = df[(df['date_slot'] == new_date.date)&(df['is_available'] == True)&(df['doctor_name'] == doctor_name)]
-    if len(available_for_desired_date) == 0:
+    if len(available_for_desired_date) == 0 or slot_holds.is_held_by_other((doctor_name, new_date.date), _session_id(config)):
         return "Not available slots in the desired period"
     else:
         cancel_appointment.invoke({'date':old_date, 'id_number':id_number, 'doctor_name':doctor_name})
-        set_appointment.invoke({'desired_date':new_date, 'id_number': id_number, 'doctor_name': doctor_name})
-        return "Successfully rescheduled for the desired time"
\ No newline at end of file
+        set_appointment.invoke({'desired_date':new_date, 'id_number': id_number, 'doctor_name': doctor_name}, config)
+        return f"Successfully rescheduled with Dr. {doctor_name.title()} from {old_date.date} to {new_date.date}"
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Memory-mapped columnar snapshot of the doctor availability schedule.
+
+File layout (all integers little-endian):
+    8 bytes   magic b"DASNAP01"
+    4 bytes   uint32 length of the JSON header
+    N bytes   JSON header: row count, doctor/specialization dictionaries and
+              the dtype/offset/count of every column
+    columns   starting at the next 64-byte boundary, each aligned to 64 bytes:
+              doctor          uint16  code into header["doctors"]
+              specialization  uint8   code into header["specializations"]
+              slot_minutes    int32   minutes since the Unix epoch, sorted ascending
+              patient         int64   patient id number, -1 when nobody attends
+              available       uint8   bitmap, one bit per row (little bit order)
+
+Rows are sorted by slot time so a single day is found with a binary search.
+Columns are exposed as zero-copy NumPy views over the mapping, so opening a
+snapshot costs a header parse regardless of the schedule size.
+
+Usage:
+    python -m src.utils.availability_snapshot data/doctor_availability.csv
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+AVAILABILITY_CSV = r"data/doctor_availability.csv"
+
+MAGIC = b"DASNAP01"
+ALIGNMENT = 64
+DATE_FORMAT = "%d-%m-%Y %H:%M"
+NO_PATIENT = -1
+
+_COLUMN_DTYPES = {
+    "doctor": "<u2",
+    "specialization": "u1",
+    "slot_minutes": "<i4",
+    "patient": "<i8",
+    "available": "u1",
+}
+
+
+def snapshot_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".snap"
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _day_to_minutes(desired_date: str) -> int:
+    day = datetime.strptime(desired_date, "%d-%m-%Y").replace(tzinfo=timezone.utc)
+    return int(day.timestamp()) // 60
+
+
+def csv_to_snapshot(csv_path: str = AVAILABILITY_CSV, out_path: str = None) -> str:
+    """Convert the availability CSV into a snapshot file. Returns the snapshot path."""
+    out_path = out_path or snapshot_path_for(csv_path)
+    df = pd.read_csv(csv_path)
+
+    slot_minutes = (pd.to_datetime(df["date_slot"], format=DATE_FORMAT).to_numpy().astype("datetime64[m]").astype(np.int64))
+    order = np.argsort(slot_minutes, kind="stable")
+
+    doctor_codes, doctors = pd.factorize(df["doctor_name"], sort=True)
+    specialization_codes, specializations = pd.factorize(df["specialization"], sort=True)
+    if len(doctors) > np.iinfo(np.uint16).max or len(specializations) > np.iinfo(np.uint8).max:
+        raise ValueError("Too many doctors or specializations for the snapshot format")
+
+    available = df["is_available"].astype(str).str.lower().eq("true").to_numpy()
+    patient = pd.to_numeric(df["patient_to_attend"], errors="coerce").fillna(NO_PATIENT).to_numpy().astype(np.int64)
+
+    columns = {
+        "doctor": doctor_codes[order].astype(_COLUMN_DTYPES["doctor"]),
+        "specialization": specialization_codes[order].astype(_COLUMN_DTYPES["specialization"]),
+        "slot_minutes": slot_minutes[order].astype(_COLUMN_DTYPES["slot_minutes"]),
+        "patient": patient[order].astype(_COLUMN_DTYPES["patient"]),
+        "available": np.packbits(available[order], bitorder="little"),
+    }
+
+    # Column offsets are relative to the first aligned byte after the header
+    layout = {}
+    offset = 0
+    for name, values in columns.items():
+        offset = _align(offset)
+        layout[name] = {"dtype": _COLUMN_DTYPES[name], "offset": offset, "count": int(values.size)}
+        offset += values.nbytes
+    header = {
+        "rows": int(len(df)),
+        "doctors": [str(name) for name in doctors],
+        "specializations": [str(name) for name in specializations],
+        "columns": layout,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, values in columns.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(values.tobytes())
+        # Pad to the end of the data section so an empty schedule still reaches data_start
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class AvailabilitySnapshot:
+    """Read-only view over a snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an availability snapshot")
+        (header_length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_length])
+        data_start = _align(start + header_length)
+
+        self.rows = header["rows"]
+        self.doctors = header["doctors"]
+        self.specializations = header["specializations"]
+        self.doctor_codes = {name: code for code, name in enumerate(self.doctors)}
+        self.specialization_codes = {name: code for code, name in enumerate(self.specializations)}
+
+        for name, column in header["columns"].items():
+            if column["count"] == 0:
+                view = np.empty(0, dtype=column["dtype"])
+            else:
+                view = np.frombuffer(self._mmap, dtype=column["dtype"], count=column["count"], offset=data_start + column["offset"])
+            setattr(self, name, view)
+
+    def __len__(self):
+        return self.rows
+
+    def day_range(self, desired_date: str) -> slice:
+        """Row range for a 'DD-MM-YYYY' day, found by binary search on slot time."""
+        day_start = _day_to_minutes(desired_date)
+        start, stop = np.searchsorted(self.slot_minutes, [day_start, day_start + 24 * 60])
+        return slice(int(start), int(stop))
+
+    def available_mask(self, rows: slice) -> np.ndarray:
+        start, stop = rows.start, rows.stop
+        bits = np.unpackbits(self.available[start // 8:-(-stop // 8)], bitorder="little")
+        return bits[start % 8:start % 8 + stop - start].astype(bool)
+
+    def day_frame(self, desired_date: str, doctor_name: str = None, specialization: str = None) -> pd.DataFrame:
+        """
+        Rows for one day with the same columns as the CSV, optionally filtered
+        by doctor or specialization. Only the matching rows are materialized.
+        """
+        rows = self.day_range(desired_date)
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+        if doctor_name is not None:
+            mask &= self.doctor[rows] == self.doctor_codes.get(doctor_name, -1)
+        if specialization is not None:
+            mask &= self.specialization[rows] == self.specialization_codes.get(specialization, -1)
+
+        index = np.flatnonzero(mask) + rows.start
+        slot_minutes = self.slot_minutes[index].astype("datetime64[m]")
+        patient = self.patient[index]
+        return pd.DataFrame({
+            "date_slot": pd.to_datetime(slot_minutes).strftime(DATE_FORMAT),
+            "specialization": np.asarray(self.specializations, dtype=object)[self.specialization[index]],
+            "doctor_name": np.asarray(self.doctors, dtype=object)[self.doctor[index]],
+            "is_available": self.available_mask(rows)[mask],
+            "patient_to_attend": np.where(patient == NO_PATIENT, np.nan, patient),
+        })
+
+    def close(self):
+        for name in _COLUMN_DTYPES:
+            self.__dict__.pop(name, None)
+        self._mmap.close()
+
+
+_snapshot_lock = threading.Lock()
+_snapshot_cache = {}
+
+
+def get_snapshot(csv_path: str = AVAILABILITY_CSV) -> AvailabilitySnapshot:
+    """
+    Open the snapshot for a CSV, rebuilding it when the CSV has changed since
+    the snapshot was written. The opened snapshot is cached per CSV path.
+    """
+    snapshot_path = snapshot_path_for(csv_path)
+    with _snapshot_lock:
+        csv_mtime = os.stat(csv_path).st_mtime_ns
+        cached = _snapshot_cache.get(csv_path)
+        if cached is not None and cached[0] == csv_mtime:
+            return cached[1]
+
+        if not os.path.exists(snapshot_path) or os.stat(snapshot_path).st_mtime_ns < csv_mtime:
+            csv_to_snapshot(csv_path, snapshot_path)
+        snapshot = AvailabilitySnapshot(snapshot_path)
+        # Older snapshots are left open: tools may still hold views into them
+        _snapshot_cache[csv_path] = (csv_mtime, snapshot)
+        return snapshot
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else AVAILABILITY_CSV
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Snapshot written to {csv_to_snapshot(source, target)}")
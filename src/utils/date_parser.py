@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import re
+from src.toolkit.doctor_registry import get_registry
 
 def parse_relative_date(text: str) -> str:
     """
@@ -39,27 +40,9 @@ def parse_relative_date(text: str) -> str:
 def extract_specialization_keyword(text: str) -> str:
     """
     Extract specialization from user query.
-    Maps common terms to official specialization names.
+    Maps common terms to the specializations in the availability data.
     """
-    text_lower = text.lower()
-    
-    # Mapping of common terms to specialization literals
-    specialization_map = {
-        'dentist': 'general_dentist',
-        'general dentist': 'general_dentist',
-        'cosmetic dentist': 'cosmetic_dentist',
-        'prosthodontist': 'prosthodontist',
-        'pediatric dentist': 'pediatric_dentist',
-        'emergency dentist': 'emergency_dentist',
-        'oral surgeon': 'oral_surgeon',
-        'orthodontist': 'orthodontist',
-    }
-    
-    for keyword, specialization in specialization_map.items():
-        if keyword in text_lower:
-            return specialization
-    
-    return None
+    return get_registry().find_specialization_in_text(text)
 
 
 def extract_doctor_name(text: str) -> str:
@@ -67,16 +50,4 @@ def extract_doctor_name(text: str) -> str:
     Extract doctor name from user query.
     Returns None if no doctor name found.
     """
-    text_lower = text.lower()
-    
-    doctor_names = [
-        'kevin anderson', 'robert martinez', 'susan davis',
-        'daniel miller', 'sarah wilson', 'michael green',
-        'lisa brown', 'jane smith', 'emily johnson', 'john doe'
-    ]
-    
-    for name in doctor_names:
-        if name in text_lower:
-            return name
-    
-    return None
+    return get_registry().find_doctor_in_text(text)
@@ -0,0 +1,149 @@
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableBinding, RunnableConfig
+
+# Retries of failed LLM calls, done here rather than in the client so they respect the deadline
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.5
+MIN_RETRY_BUDGET = 1.0
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time or its client has gone away."""
+
+    def __init__(self, where: str = "", cancelled: bool = False):
+        self.where = where
+        self.cancelled = cancelled
+        reason = "request cancelled" if cancelled else "request deadline exceeded"
+        super().__init__(f"{reason} before {where}" if where else reason)
+
+
+class Deadline:
+    """
+    Time budget for a single /execute request.
+    Uses a monotonic clock so wall-clock changes do not affect it.
+    cancel() can be called from another thread (e.g. on client disconnect).
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self, where: str = ""):
+        if self.cancelled:
+            raise DeadlineExceeded(where, cancelled=True)
+        if self.expired():
+            raise DeadlineExceeded(where)
+
+
+def get_deadline(config: Optional[RunnableConfig]) -> Optional[Deadline]:
+    """Return the Deadline stored in config['configurable'], if any."""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("deadline")
+
+
+class DeadlineTimeoutBinding(RunnableBinding):
+    """
+    Binding that passes the deadline's remaining budget as `timeout` on every
+    call, so later LLM rounds in a react agent loop get the time actually left.
+    Being a RunnableBinding, create_react_agent accepts it as a pre-bound model.
+
+    The client must be built with retries disabled, since its own retries would
+    repeat a timed-out call with the full timeout again. Errors in `retry_on` are
+    retried here instead, only while the remaining budget covers the backoff.
+    """
+
+    deadline: Any = None
+    retry_on: tuple = ()
+    max_retries: int = MAX_RETRIES
+
+    def _timeout_kwargs(self, kwargs: dict) -> dict:
+        if self.deadline is None:
+            return kwargs
+        return {**kwargs, "timeout": self.deadline.remaining()}
+
+    def _retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Backoff before the next attempt, or None if the error should be raised."""
+        if not isinstance(error, self.retry_on) or attempt >= self.max_retries:
+            return None
+        delay = RETRY_BACKOFF * 2 ** attempt
+        if self.deadline is not None and self.deadline.remaining() < delay + MIN_RETRY_BUDGET:
+            return None
+        return delay
+
+    def invoke(self, input, config=None, **kwargs):
+        for attempt in itertools.count():
+            try:
+                return super().invoke(input, config, **self._timeout_kwargs(kwargs))
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        for attempt in itertools.count():
+            try:
+                return await super().ainvoke(input, config, **self._timeout_kwargs(kwargs))
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def stream(self, input, config=None, **kwargs):
+        yield from super().stream(input, config, **self._timeout_kwargs(kwargs))
+
+    async def astream(self, input, config=None, **kwargs):
+        async for chunk in super().astream(input, config, **self._timeout_kwargs(kwargs)):
+            yield chunk
+
+
+def with_deadline_timeout(runnable, deadline: Optional[Deadline], retry_on: tuple = ()):
+    """
+    Wrap a model (or a binding of one) so each call gets the remaining budget as
+    its timeout and errors in `retry_on` are retried while the budget allows.
+    """
+    if isinstance(runnable, RunnableBinding):
+        return DeadlineTimeoutBinding(bound=runnable.bound, kwargs=runnable.kwargs, config=runnable.config, deadline=deadline, retry_on=retry_on)
+    return DeadlineTimeoutBinding(bound=runnable, deadline=deadline, retry_on=retry_on)
+
+
+class DeadlineCallbackHandler(BaseCallbackHandler):
+    """
+    Checks the deadline before every LLM and tool call in the graph,
+    including the ones made inside the prebuilt react agents.
+    """
+
+    raise_error = True
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.deadline.check("LLM call")
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.deadline.check("LLM call")
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.deadline.check(f"tool call {(serialized or {}).get('name', '')}".strip())
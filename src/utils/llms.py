@@ -1,4 +1,5 @@
 import os
+import groq
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 
@@ -9,14 +10,18 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("❌ GROQ_API_KEY is not set in .env file")
 
+# Transient Groq errors worth retrying (the same ones the Groq client retries itself)
+RETRYABLE_ERRORS = (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+
 class LLMModel:
-    def __init__(self, model_name: str = "llama-3.1-8b-instant"):
+    def __init__(self, model_name: str = "llama-3.1-8b-instant", max_retries: int = 2):
         self.model_name = model_name
 
         self.llm = ChatGroq(
             model=self.model_name,
             temperature=0,
             max_tokens=1024,
+            max_retries=max_retries,
         )
 
     def get_model(self):
@@ -0,0 +1,216 @@
+"""
+Opt-in sampling profiler for a single /execute request.
+
+While active, a background thread samples the stacks of the threads running the
+request every PROFILE_INTERVAL_MS and prefixes each stack with the LangGraph
+node(s) and tool executing at that moment, e.g.
+"node:booking_node;node:tools;tool:set_appointment;...".
+The result is written to PROFILES_DIR/<request_id>.folded in the collapsed
+stack format read by flamegraph.pl, speedscope and inferno, with a per-node
+summary next to it in <request_id>.json. Sampling is wall-clock, so a thread
+waiting on the Groq HTTP call is counted where it waits. Only the newest
+PROFILE_RETENTION profiles are kept.
+
+Nothing is created for requests that are not profiled.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+from langchain_core.callbacks import BaseCallbackHandler
+
+PROFILES_DIR = "profiles"
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_RETENTION = max(1, int(os.getenv("PROFILE_RETENTION", "100")))
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def profile_path(request_id: str, suffix: str = ".folded") -> Optional[str]:
+    """Path of a stored profile, or None if the id is not a valid request id."""
+    if not _REQUEST_ID.match(request_id):
+        return None
+    return os.path.join(PROFILES_DIR, request_id + suffix)
+
+
+def claim_profile_id(request_id: str) -> str:
+    """
+    Reserve a profile id so no two requests write the same file. A requested id
+    that is invalid gets a random one; one already taken gets a random suffix.
+    """
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    base = request_id if profile_path(request_id) else None
+    candidate = base or uuid.uuid4().hex
+    while True:
+        try:
+            with open(profile_path(candidate), "x"):
+                return candidate
+        except FileExistsError:
+            candidate = f"{(base or 'profile')[:55]}-{uuid.uuid4().hex[:8]}"
+
+
+def prune_profiles(keep: Optional[int] = None):
+    """Delete all but the `keep` (default PROFILE_RETENTION) most recent profiles."""
+    keep = keep or PROFILE_RETENTION
+    try:
+        names = [name for name in os.listdir(PROFILES_DIR) if name.endswith(".folded")]
+    except FileNotFoundError:
+        return
+    paths = [os.path.join(PROFILES_DIR, name) for name in names]
+    paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0, reverse=True)
+    for path in paths[keep:]:
+        for stale in (path, path[:-len(".folded")] + ".json"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class NodeTrackingCallbackHandler(BaseCallbackHandler):
+    """Records which graph node each thread is running, for stack annotation."""
+
+    def __init__(self, profiler: "RequestProfiler"):
+        self.profiler = profiler
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Nested runnables inherit langgraph_node; only the node's own run opens a frame
+        if node and kwargs.get("name") == node:
+            self.profiler.enter_node(run_id, node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self.profiler.exit_node(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.profiler.exit_node(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        # ToolNode runs tools on executor threads; label them with the calling node
+        self.profiler.enter_tool(run_id, parent_run_id, (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self.profiler.exit_node(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self.profiler.exit_node(run_id)
+
+
+class RequestProfiler:
+    def __init__(self, request_id: str, interval: float = PROFILE_INTERVAL):
+        self.request_id = request_id
+        self.interval = interval
+        self.samples = Counter()
+        self.callback = NodeTrackingCallbackHandler(self)
+        self._threads = set()
+        self._node_stacks = {}
+        self._run_labels = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._owner_thread = None
+        self._started_at = None
+        self.duration = 0.0
+
+    def add_thread(self, thread_id: int = None):
+        with self._lock:
+            self._threads.add(thread_id or threading.get_ident())
+
+    def _push(self, run_id, label: str, inherited: list = ()):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads.add(thread_id)
+            stack = self._node_stacks.setdefault(thread_id, [])
+            if not stack:
+                stack.extend((None, parent_label) for parent_label in inherited)
+            stack.append((run_id, label))
+            self._run_labels[run_id] = [entry_label for _, entry_label in stack]
+
+    def enter_node(self, run_id, node: str):
+        self._push(run_id, f"node:{node}")
+
+    def enter_tool(self, run_id, parent_run_id, name: str):
+        with self._lock:
+            inherited = self._run_labels.get(parent_run_id, [])
+        self._push(run_id, f"tool:{name}", inherited)
+
+    def exit_node(self, run_id):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._run_labels.pop(run_id, None)
+            stack = self._node_stacks.get(thread_id)
+            if stack and stack[-1][0] == run_id:
+                stack.pop()
+                # Drop labels borrowed from the parent thread once the tool is done
+                if stack and stack[-1][0] is None:
+                    stack.clear()
+            # Pool threads are reused by other requests; stop sampling them once their work here is done
+            if not stack and thread_id != self._owner_thread:
+                self._threads.discard(thread_id)
+                self._node_stacks.pop(thread_id, None)
+
+    def start(self):
+        """Start sampling the calling thread (plus any thread that runs graph nodes)."""
+        self._owner_thread = threading.get_ident()
+        self.add_thread(self._owner_thread)
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.request_id}", daemon=True)
+        self._sampler.start()
+
+    def _run(self):
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                targets = [(thread_id, [label for _, label in self._node_stacks.get(thread_id, [])]) for thread_id in self._threads if thread_id != sampler_id]
+            for thread_id, nodes in targets:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                self.samples[";".join(nodes + stack[::-1])] += 1
+
+    def stop(self) -> dict:
+        """Stop sampling, write the profile and return its per-node summary."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started_at if self._started_at else 0.0
+        summary = self.summary()
+
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        with open(profile_path(self.request_id), "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(profile_path(self.request_id, ".json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        prune_profiles()
+        return summary
+
+    def summary(self) -> dict:
+        # Key samples by node path (e.g. information_node/tools/tool:set_appointment); samples outside any node are graph/server overhead
+        nodes = Counter()
+        for stack, count in self.samples.items():
+            labels = [frame[len("node:"):] if frame.startswith("node:") else frame for frame in stack.split(";") if frame.startswith(("node:", "tool:"))]
+            nodes["/".join(labels) or "(outside nodes)"] += count
+        total = sum(nodes.values())
+        return {
+            "request_id": self.request_id,
+            "duration_seconds": round(self.duration, 4),
+            "interval_seconds": self.interval,
+            "samples": total,
+            "nodes": {node: {"samples": count, "share": round(count / total, 4)} for node, count in nodes.most_common()},
+        }